@@ -7,8 +7,16 @@ GitHub Image Host (GitHub 图床工具)
 - 支持：
     - 单个上传 / 删除 / 更新 / 查询
     - 批量上传 / 删除 / 更新
-    - 自动创建目录（.gitkeep）
+    - 目录无需预先创建（contents API 写入文件时自动创建父目录）
     - 清空目录但保留指定文件
+    - 异步客户端 AsyncGitHubImageHost（大批量并发）
+
+可选依赖：
+- httpx[http2]：传入 http2=True（或自备 httpx.Client）后，
+  所有请求复用同一条 HTTP/2 连接多路复用
+- pybase64：安装后 base64 编码自动使用 SIMD（SSSE3 / AVX2 / AVX-512）实现，
+  大文件上传时编码速度显著提升
+- aiohttp：使用 AsyncGitHubImageHost 时需要
 
 典型使用场景：
 - 个人 / 项目图床
@@ -16,22 +24,91 @@ GitHub Image Host (GitHub 图床工具)
 - 飞书 / Notion / Markdown 外链图片
 """
 
+import asyncio
 import os
-import base64
+import hashlib
 import json
+import mmap
 import threading
 import time
+from binascii import b2a_base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import Iterable, Dict, Optional, Set
+from typing import Awaitable, Iterable, Dict, List, Mapping, Optional, Set, Tuple
+from urllib.parse import quote, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # 可选依赖
+    httpx = None
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖
+    aiohttp = None
+
+try:
+    # 运行时按 CPU 特性选择 SIMD 实现
+    from pybase64 import b64encode as _b64encode
+except ImportError:  # 可选依赖
+    _b64encode = partial(b2a_base64, newline=False)
 
 
-class GitHubImageHost:
+# 分块编码的块大小（必须是 3 的倍数，保证各块 base64 可直接拼接）
+_B64_CHUNK = 3 * 1024 * 1024
+# 小于该大小的文件直接 read_bytes，不走 mmap
+_MMAP_THRESHOLD = 1024 * 1024
+
+# {host: 是否支持 HEAD}，遇到 405 后该 host 改用 GET
+_HEAD_SUPPORTED: Dict[str, bool] = {}
+
+
+def _ok(resp) -> bool:
     """
-    GitHub 图床客户端
+    兼容 requests / httpx 的响应成功判断
+    """
+    return resp.status_code < 400
 
-    一个实例 = 一个 GitHub 仓库 + 一个目录
+
+class BatchError(RuntimeError):
+    """
+    批量操作中有条目失败（其余条目照常执行完）
+
+    Attributes:
+        done: 已成功的条目 {输入: 结果}
+        errors: 失败的条目 {输入: 异常}
+    """
+
+    def __init__(self, done: Dict[str, Optional[str]], errors: Dict[str, Exception]):
+        super().__init__(f"{len(errors)} 个失败，{len(done)} 个成功：{next(iter(errors.values()))!r}")
+        self.done = done
+        self.errors = errors
+
+
+class _ImageHostBase:
+    """
+    同步 / 异步客户端共用的部分：配置、URL 构造、请求体构造与缓存
+
+    不发起任何网络请求
+    """
+
+    _HEAD_OID_QUERY = """
+    query($owner: String!, $repo: String!, $ref: String!) {
+      repository(owner: $owner, name: $repo) {
+        ref(qualifiedName: $ref) { target { oid ... on Commit { tree { oid } } } }
+      }
+    }
+    """
+
+    _CREATE_COMMIT_MUTATION = """
+    mutation($input: CreateCommitOnBranchInput!) {
+      createCommitOnBranch(input: $input) { commit { oid } }
+    }
     """
 
     def __init__(
@@ -39,38 +116,42 @@ class GitHubImageHost:
         *,
         owner: str,
         repo: str,
-        branch: str = "main",
-        subdir: str = "img/",
-        token: Optional[str] = None,
-        custom_cdn: Optional[str] = None,
-        max_concurrency: int = 4,
-        session: Optional[requests.Session] = None,
+        branch: str,
+        subdir: str,
+        token: Optional[str],
+        custom_cdn: Optional[str],
+        max_concurrency: int,
+        content_addressed: bool,
     ):
-        """
-        初始化 GitHub 图床实例
-
-        Args:
-            owner: GitHub 用户名 / 组织名
-            repo: 仓库名
-            branch: 分支名（默认 main）
-            subdir: 仓库内目录（如 img/）
-            token: GitHub PAT（不传则读取环境变量 GITHUB_PAT）
-            custom_cdn: 自定义 CDN 前缀（不传则使用 jsDelivr）
-            max_concurrency: 最大并发上传/删除数
-            session: 可复用的 requests.Session
-        """
         self.owner = owner
         self.repo = repo
         self.branch = branch
         self.subdir = subdir.strip("/") + "/" if subdir else ""
         self.token = token or os.getenv("GITHUB_PAT")
         self.custom_cdn = custom_cdn
+        self.content_addressed = content_addressed
 
         if not self.token:
             raise RuntimeError("缺少 GitHub PAT，请设置 token 或环境变量 GITHUB_PAT")
 
-        self.session = session or requests.Session()
-        self._sema = threading.Semaphore(max_concurrency)
+        # URL 固定前缀只拼一次
+        self._api_base = f"https://api.github.com/repos/{owner}/{repo}/contents/"
+        self._git_base = f"https://api.github.com/repos/{owner}/{repo}/git/"
+        self._cdn_base = (
+            custom_cdn.rstrip("/") + "/" if custom_cdn
+            else f"https://cdn.jsdelivr.net/gh/{owner}/{repo}@{branch}/"
+        )
+
+        self._max_concurrency = max_concurrency
+        # {api_path: (etag, sha)}，用于条件请求（304 不消耗速率配额）
+        self._etag_cache: Dict[str, Tuple[str, Optional[str]]] = {}
+        # {path: blob sha}，由 _list_tree() 读取 subdir 这一层目录填充，用于跳过查询 sha 的 GET；
+        # 只在单次批量操作内有效，批量结束后置空，避免后续调用拿到过期 sha
+        self._tree_cache: Optional[Dict[str, str]] = None
+
+        # 固定结构的小请求体：预先拼好模板，调用时只转义 message
+        branch_json = json.dumps(self.branch).replace("%", "%%")
+        self._delete_tmpl = '{"message": %s, "sha": "%s", "branch": ' + branch_json + "}"
 
         self._headers = {
             "Authorization": f"Bearer {self.token}",
@@ -85,128 +166,735 @@ class GitHubImageHost:
         """
         构造 GitHub contents API URL
         """
-        return f"https://api.github.com/repos/{self.owner}/{self.repo}/contents/{path}"
+        return self._api_base + path
+
+    def _git_url(self, path: str) -> str:
+        """
+        构造 GitHub Git Data API URL
+        """
+        return self._git_base + path
+
+    def _dir_tree_url(self, ref: str, dir_path: str) -> str:
+        """
+        构造单个目录 tree 的 Git Data API URL（<ref>:<目录>，根目录直接用 ref）
+        """
+        if not dir_path:
+            return self._git_url(f"trees/{ref}")
+        return self._git_url(f"trees/{ref}:{quote(dir_path.rstrip('/'))}")
 
     def _cdn_url(self, filename: str) -> str:
         """
         构造文件的 CDN 访问 URL
         """
-        rel = f"{self.subdir}{filename}".lstrip("/")
-        if self.custom_cdn:
-            return f"{self.custom_cdn.rstrip('/')}/{rel}"
-        return f"https://cdn.jsdelivr.net/gh/{self.owner}/{self.repo}@{self.branch}/{rel}"
+        return self._cdn_base + f"{self.subdir}{filename}".lstrip("/")
 
-    def _ensure_dir(self):
+    @staticmethod
+    def _encode_file_b64(path: Path, prefix: bytes = b"", suffix: bytes = b"") -> bytearray:
         """
-        确保 subdir 在仓库中存在
+        分块 base64 编码文件，结果为 prefix + base64 + suffix
 
-        GitHub 没有“创建目录”的概念，
-        实际做法是创建一个 .gitkeep 文件
+        base64 长度可精确算出，整个缓冲区按最终大小一次性分配，
+        编码结果直接写入其中，无需再拼接出一份完整副本；
+        大文件通过 mmap 只读映射（按需分页，不在堆上复制整个文件），
+        小文件 mmap 的固定开销不划算，直接整体读取
         """
-        if not self.subdir:
-            return
+        size = path.stat().st_size
+        pos = len(prefix)
+        out = bytearray(pos + ((size + 2) // 3) * 4 + len(suffix))
+        out[:pos] = prefix
+        out[len(out) - len(suffix):] = suffix
+
+        if size < _MMAP_THRESHOLD:
+            enc = _b64encode(path.read_bytes())
+            out[pos:pos + len(enc)] = enc
+            return out
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for off in range(0, size, _B64_CHUNK):
+                enc = _b64encode(mm[off:off + _B64_CHUNK])
+                out[pos:pos + len(enc)] = enc
+                pos += len(enc)
+        return out
+
+    @staticmethod
+    def _git_blob_sha(path: Path) -> str:
+        """
+        计算本地文件的 git blob sha（与 GitHub 返回的 sha 一致）
 
-        r = self.session.get(self._api_url(self.subdir), headers=self._headers)
-        if r.ok:
-            return
+        sha1("blob <size>\\0" + content)，按 1 MiB 分块流式计算
+        """
+        h = hashlib.sha1(b"blob %d\0" % path.stat().st_size)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def _file_digests(path: Path) -> Tuple[str, str]:
+        """
+        一次读取同时计算 git blob sha 与 sha256
+
+        Returns:
+            (blob sha, sha256 hex)
+        """
+        blob = hashlib.sha1(b"blob %d\0" % path.stat().st_size)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                blob.update(chunk)
+                digest.update(chunk)
+        return blob.hexdigest(), digest.hexdigest()
+
+    def _upload_name(self, path: Path) -> Tuple[str, Optional[str]]:
+        """
+        决定上传到仓库的文件名
+
+        Returns:
+            (文件名, blob sha)；blob sha 仅在按内容命名时顺带算出，否则为 None
+        """
+        if not self.content_addressed:
+            return path.name, None
+        blob_sha, digest = self._file_digests(path)
+        return digest[:16] + path.suffix, blob_sha
+
+    @staticmethod
+    def _timestamped_name(path: Path) -> str:
+        """
+        同名不同内容时改用的带时间戳文件名
+        """
+        ts = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        return f"{path.stem}-{ts}{path.suffix}"
+
+    def _content_prefix(self, message: str, sha: Optional[str] = None) -> bytes:
+        """
+        PUT contents 请求体中 content 之前的部分
+        """
+        head = {"message": message, "branch": self.branch}
+        if sha:
+            head["sha"] = sha
+        return json.dumps(head)[:-1].encode() + b', "content": "'
+
+    def _content_body(self, message: str, path: Path, sha: Optional[str] = None) -> bytearray:
+        """
+        构造 PUT contents 请求体
+
+        base64 字母表无需 JSON 转义，文件直接编码进预分配的请求体，跳过 json.dumps
+        """
+        return self._encode_file_b64(path, self._content_prefix(message, sha), b'"}')
+
+    def _replace_sha(self, body: bytearray, message: str, old_sha: str, new_sha: str):
+        """
+        原地替换请求体中的 sha（重试时无需重新编码整个文件）
+        """
+        body[:len(self._content_prefix(message, old_sha))] = self._content_prefix(message, new_sha)
+
+    def _delete_body(self, path: str, sha: str) -> bytes:
+        """
+        构造 DELETE contents 请求体
+        """
+        message = json.dumps(f"delete {path.rsplit('/', 1)[-1]}")
+        return (self._delete_tmpl % (message, sha)).encode()
+
+    def _conditional_headers(self, path: str) -> Tuple[Dict[str, str], Optional[Tuple[str, Optional[str]]]]:
+        """
+        构造条件 GET 的请求头
 
-        body = {
-            "message": "init dir",
-            "content": base64.b64encode(b"").decode(),
-            "branch": self.branch,
+        Returns:
+            (headers, 缓存项)；无缓存时缓存项为 None
+        """
+        cached = self._etag_cache.get(path)
+        if cached:
+            return {**self._headers, "If-None-Match": cached[0]}, cached
+        return self._headers, None
+
+    def _remember_etag(self, path: str, etag: Optional[str], data) -> Optional[str]:
+        """
+        记录 200 响应的 ETag，返回其中的 sha（目录为 None）
+        """
+        sha = data.get("sha") if isinstance(data, dict) else None
+        if etag:
+            self._etag_cache[path] = (etag, sha)
+        return sha
+
+    def _invalidate(self, path: str):
+        """
+        文件被修改 / 删除后，清理该路径的 ETag 与 tree 缓存
+        """
+        self._etag_cache.pop(path, None)
+        if self._tree_cache is not None:
+            self._tree_cache.pop(path, None)
+
+    def _cache_tree(self, tree: dict, dir_path: str):
+        """
+        用目录 tree 响应刷新 {path: sha} 缓存（条目 path 相对于 dir_path）
+        """
+        self._tree_cache = {
+            dir_path + item["path"]: item["sha"] for item in tree["tree"] if item["type"] == "blob"
         }
 
-        self.session.put(
-            self._api_url(f"{self.subdir}.gitkeep"),
-            headers=self._headers,
-            data=json.dumps(body),
-        )
+    def _cached_sha(self, path: str) -> Optional[str]:
+        """
+        从 tree 缓存中取 sha（未命中返回 None）
+        """
+        if self._tree_cache is not None:
+            return self._tree_cache.get(path)
+        return None
 
-    # ======================================================
-    # 单文件 CRUD
-    # ======================================================
-    def upload(self, file_path: str) -> str:
+    @staticmethod
+    def _clear_targets(tree: dict, target_dir: str, keep: Set[str]) -> List[dict]:
         """
-        上传单个文件到图床
+        从 target_dir 的目录 tree 中挑出需要删除的文件（不含子目录），path 补全为仓库路径
+        """
+        return [
+            {"path": target_dir + item["path"], "mode": item["mode"]}
+            for item in tree["tree"]
+            if item["type"] == "blob" and item["path"] not in keep
+        ]
+
+    @staticmethod
+    def _removal_tree_body(base_tree: str, removed: List[dict]) -> dict:
+        """
+        构造删除文件用的 POST git/trees 请求体
+        """
+        return {
+            "base_tree": base_tree,
+            "tree": [
+                {"path": item["path"], "mode": item["mode"], "type": "blob", "sha": None}
+                for item in removed
+            ],
+        }
+
+    def _after_clear(self, target_dir: str, removed_paths: Iterable[str]):
+        """
+        清空目录后清理相关缓存
+        """
+        for path in removed_paths:
+            self._invalidate(path)
+        self._etag_cache.pop(target_dir, None)
+
+    @staticmethod
+    def _graphql_body(query: str, variables) -> bytes:
+        """
+        构造 GraphQL 请求体
 
         Args:
-            file_path: 本地文件路径
+            query: GraphQL 查询 / 变更语句
+            variables: dict，或已序列化的 JSON bytes（用于内嵌大块 base64 内容）
+        """
+        if isinstance(variables, dict):
+            variables = json.dumps(variables).encode()
+        return b'{"query": ' + json.dumps(query).encode() + b', "variables": ' + variables + b"}"
 
-        Returns:
-            CDN 访问 URL
+    @staticmethod
+    def _graphql_data(result: dict) -> dict:
+        """
+        取出 GraphQL 响应中的 data，有 errors 时抛出
+        """
+        if result.get("errors"):
+            raise RuntimeError(json.dumps(result["errors"], ensure_ascii=False))
+        return result["data"]
+
+    def _head_oid_variables(self) -> dict:
+        return {
+            "owner": self.owner,
+            "repo": self.repo,
+            "ref": f"refs/heads/{self.branch}",
+        }
+
+    def _head_target(self, data: dict) -> Tuple[str, str]:
+        """
+        从 _HEAD_OID_QUERY 的结果中取出 (HEAD commit sha, 根 tree sha)
+        """
+        ref = data["repository"]["ref"]
+        if not ref:
+            raise RuntimeError(f"分支不存在: {self.branch}")
+        return ref["target"]["oid"], ref["target"]["tree"]["oid"]
+
+    def _atomic_commit_variables(self, names: List[str], paths: List[Path], head_oid: str) -> bytes:
         """
-        self._ensure_dir()
+        构造 createCommitOnBranch 的 variables
 
+        每个 addition 直接编码进预分配的缓冲区，base64 内容无需再转 str / 过 json.dumps
+        """
+        additions = b", ".join(
+            self._encode_file_b64(
+                p,
+                b'{"path": ' + json.dumps(f"{self.subdir}{name}").encode() + b', "contents": "',
+                b'"}',
+            )
+            for name, p in zip(names, paths)
+        )
+        head = {
+            "branch": {
+                "repositoryNameWithOwner": f"{self.owner}/{self.repo}",
+                "branchName": self.branch,
+            },
+            "message": {"headline": f"upload {len(names)} files"},
+            "expectedHeadOid": head_oid,
+        }
+        return (
+            b'{"input": ' + json.dumps(head)[:-1].encode()
+            + b', "fileChanges": {"additions": [' + additions + b"]}}}"
+        )
+
+    def _after_atomic_upload(self, names: List[str]):
+        for name in names:
+            self._invalidate(f"{self.subdir}{name}")
+
+    # ======================================================
+    # 单文件操作流程（同步 / 异步客户端共用）
+    # ======================================================
+    # 流程写成生成器：每一步 yield (操作, *参数)，由子类的 _run 执行后把结果 send 回来
+    #   ("cpu", fn, *args)            fn(*args)，哈希 / 编码（异步客户端放到线程中执行）
+    #   ("_conditional_get", path)    -> (sha, status)
+    #   ("_lookup_sha", path)         -> (sha, status)
+    #   ("_put_content", path, body)  -> (status, text)，写请求串行执行
+    #   ("_delete_by_sha", path, sha) -> (status, text)，写请求串行执行
+    #   ("_head_commit",)             -> (HEAD commit sha, 根 tree sha)
+    #   ("_dir_tree", ref, dir_path)  -> 目录 tree
+    #   ("_commit_removal", head, root_tree, removed, message) -> (新 commit sha, 新根 tree sha)
+    def _upload_steps(self, file_path: str):
         p = Path(file_path)
         if not p.is_file():
             raise FileNotFoundError(file_path)
 
-        filename = p.name
-        content_b64 = base64.b64encode(p.read_bytes()).decode("ascii")
+        filename, blob_sha = yield ("cpu", self._upload_name, p)
         api_path = f"{self.subdir}{filename}"
 
-        body = {
-            "message": f"upload {filename}",
-            "content": content_b64,
-            "branch": self.branch,
-        }
+        # 先比对 blob sha：内容相同直接复用（按内容命名时即幂等上传）；
+        # 同名不同内容则直接改用带时间戳的文件名，不再先 PUT 撞上 422 再重传一遍完整内容。
+        # 这里不走 tree 缓存：文件可能已被外部删除，缓存命中会返回失效的 URL
+        remote_sha, status = yield ("_conditional_get", api_path)
+        if status < 400:
+            local_sha = blob_sha or (yield ("cpu", self._git_blob_sha, p))
+            if remote_sha == local_sha:
+                return self._cdn_url(filename)
+
+            filename = self._timestamped_name(p)
+            api_path = f"{self.subdir}{filename}"
+
+        body = yield ("cpu", self._content_body, f"upload {filename}", p)
+        status, text = yield ("_put_content", api_path, body)
+
+        # 预检之后同名文件被并发写入（422）：按内容命名时内容必然相同，直接复用；
+        # 否则改用带时间戳的文件名重试一次
+        if status == 422:
+            if blob_sha is not None:
+                self._invalidate(api_path)
+                return self._cdn_url(filename)
+
+            filename = self._timestamped_name(p)
+            api_path = f"{self.subdir}{filename}"
+            body = yield ("cpu", self._content_body, f"upload {filename}", p)
+            status, text = yield ("_put_content", api_path, body)
+
+        if status >= 400:
+            raise RuntimeError(text)
+
+        self._invalidate(api_path)
+        return self._cdn_url(filename)
 
-        with self._sema:
-            resp = self.session.put(
-                self._api_url(api_path),
-                headers=self._headers,
-                data=json.dumps(body),
-                timeout=30,
-            )
+    @staticmethod
+    def _check_delete_sha(api_path: str, sha: Optional[str], status: int):
+        """
+        查询 sha 失败（限流 / 5xx 等）或路径是目录时直接报错，不再发出 DELETE
+        """
+        if status >= 400:
+            raise RuntimeError(f"无法获取文件 sha: {api_path}（HTTP {status}）")
+        if sha is None:
+            raise RuntimeError(f"不是文件: {api_path}")
+
+    def _delete_steps(self, api_path: str, sha: Optional[str] = None):
+        if sha is None:
+            sha, status = yield ("_lookup_sha", api_path)
+            if status == 404:
+                return
+            self._check_delete_sha(api_path, sha, status)
+
+        status, text = yield ("_delete_by_sha", api_path, sha)
+
+        # tree 缓存中的 sha 已过期：重新查询后重试一次
+        if status == 409:
+            self._invalidate(api_path)
+            sha, status = yield ("_conditional_get", api_path)
+            if status == 404:
+                return
+            self._check_delete_sha(api_path, sha, status)
+            status, text = yield ("_delete_by_sha", api_path, sha)
+
+        if status >= 400:
+            raise RuntimeError(text)
+
+    def _update_steps(self, file_path: str, filename: Optional[str]):
+        p = Path(file_path)
+        name = filename or p.name
+        api_path = f"{self.subdir}{name}"
+
+        sha, status = yield ("_lookup_sha", api_path)
+        if status >= 400:
+            raise FileNotFoundError(name)
 
-            # 文件已存在：自动重命名
-            if resp.status_code == 422:
-                ts = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
-                filename = f"{p.stem}-{ts}{p.suffix}"
-                api_path = f"{self.subdir}{filename}"
-                body["message"] = f"upload {filename}"
+        # 内容未变化：跳过上传
+        if sha == (yield ("cpu", self._git_blob_sha, p)):
+            return self._cdn_url(name)
 
-                resp = self.session.put(
-                    self._api_url(api_path),
-                    headers=self._headers,
-                    data=json.dumps(body),
-                    timeout=30,
-                )
+        message = f"update {name}"
+        body = yield ("cpu", self._content_body, message, p, sha)
+        status, text = yield ("_put_content", api_path, body)
+
+        # tree 缓存中的 sha 已过期：重新查询后重试一次
+        if status == 409:
+            self._invalidate(api_path)
+            new_sha, status = yield ("_conditional_get", api_path)
+            if status >= 400:
+                raise FileNotFoundError(name)
+            self._replace_sha(body, message, sha, new_sha)
+            status, text = yield ("_put_content", api_path, body)
+
+        if status >= 400:
+            raise RuntimeError(text)
+
+        self._invalidate(api_path)
+        return self._cdn_url(name)
 
-            if not resp.ok:
-                raise RuntimeError(resp.text)
+    def _clear_dir_steps(self, target_dir: str, keep: Set[str]):
+        # 只读目标目录这一层的 tree，在单个 commit 中删除其中的文件，请求数与文件数、仓库大小无关；
+        # 目录项超过单次 tree 响应上限（truncated）时，删掉这一批后再读剩下的
+        head, root_tree = yield ("_head_commit",)
+        count = 0
+        while True:
+            tree = yield ("_dir_tree", head, target_dir)
+            removed = self._clear_targets(tree, target_dir, keep)
+            if removed:
+                message = f"clear {target_dir or '/'} ({len(removed)} files)"
+                head, root_tree = yield ("_commit_removal", head, root_tree, removed, message)
+                self._after_clear(target_dir, (item["path"] for item in removed))
+                count += len(removed)
+            if not removed or not tree.get("truncated"):
+                return count
 
+    def get_url(self, filename: str) -> str:
+        """
+        获取文件的 CDN URL（不检查是否存在）
+        """
         return self._cdn_url(filename)
 
-    def delete(self, filename: str) -> None:
+
+class GitHubImageHost(_ImageHostBase):
+    """
+    GitHub 图床客户端
+
+    一个实例 = 一个 GitHub 仓库 + 一个目录
+    """
+
+    def __init__(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        branch: str = "main",
+        subdir: str = "img/",
+        token: Optional[str] = None,
+        custom_cdn: Optional[str] = None,
+        max_concurrency: int = 4,
+        content_addressed: bool = False,
+        session: Optional[requests.Session] = None,
+        client: Optional["httpx.Client"] = None,
+        http2: bool = False,
+    ):
         """
-        删除仓库中的文件（若不存在则忽略）
+        初始化 GitHub 图床实例
 
         Args:
-            filename: 仓库中的文件名（不要带目录）
+            owner: GitHub 用户名 / 组织名
+            repo: 仓库名
+            branch: 分支名（默认 main）
+            subdir: 仓库内目录（如 img/）
+            token: GitHub PAT（不传则读取环境变量 GITHUB_PAT）
+            custom_cdn: 自定义 CDN 前缀（不传则使用 jsDelivr）
+            max_concurrency: 并发查询 / 哈希 / 编码的线程数
+                （GitHub 要求同一分支上的写操作串行执行，写请求始终逐个发送）
+            content_addressed: 按内容哈希命名（<sha256 前 16 位><扩展名>），
+                相同内容同一 URL，可被 CDN 永久缓存
+            session: 可复用的 requests.Session
+            client: 可复用的 httpx.Client（传入后所有请求走 httpx）
+            http2: 未传 client 时自动创建启用 HTTP/2 的 httpx.Client
+
+        注意：5xx 自动重试只挂在内部创建的 requests.Session 上，
+        走 httpx（client / http2）时不生效
         """
-        api_path = f"{self.subdir}{filename}"
+        super().__init__(
+            owner=owner,
+            repo=repo,
+            branch=branch,
+            subdir=subdir,
+            token=token,
+            custom_cdn=custom_cdn,
+            max_concurrency=max_concurrency,
+            content_addressed=content_addressed,
+        )
+
+        if client is None and http2:
+            if httpx is None:
+                raise RuntimeError("启用 HTTP/2 需要安装 httpx：pip install 'httpx[http2]'")
+            client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                ),
+                timeout=None,
+            )
+            self._own_client = True
+        else:
+            self._own_client = False
+        self.client = client
+
+        # 走 httpx 时不再创建用不到的 requests.Session
+        self.session = session
+        self._own_session = session is None and client is None
+        if self._own_session:
+            self.session = requests.Session()
+            # 连接池与并发数对齐，避免多线程争抢连接；幂等方法遇到 5xx 自动重试
+            adapter = HTTPAdapter(
+                pool_connections=max_concurrency,
+                pool_maxsize=max_concurrency,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[502, 503, 504],
+                    allowed_methods=frozenset(["GET", "PUT", "DELETE"]),
+                    # 重试耗尽后返回最后一次响应，由调用方按状态码处理
+                    raise_on_status=False,
+                ),
+            )
+            self.session.mount("https://", adapter)
 
-        r = self.session.get(self._api_url(api_path), headers=self._headers)
+        # 同一分支上的 contents 写操作必须串行，并发写入只会互相撞出 409
+        self._write_lock = threading.Lock()
+
+    def __enter__(self) -> "GitHubImageHost":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        关闭实例内部创建的 httpx.Client / requests.Session（外部传入的不处理）
+        """
+        if self._own_client and self.client is not None:
+            self.client.close()
+            self.client = None
+        if self._own_session and self.session is not None:
+            self.session.close()
+            self.session = None
+
+    # ======================================================
+    # 内部工具方法（不建议外部直接调用）
+    # ======================================================
+    def _http(self, method: str, url: str, **kwargs):
+        """
+        发送 HTTP 请求：有 httpx.Client 时走 httpx，否则走 requests.Session
+
+        data= 只用于已序列化好的 JSON bytes，补上与 json= 一致的 Content-Type
+        """
+        if "data" in kwargs:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+
+        if self.client is None:
+            return self.session.request(method, url, **kwargs)
+
+        if "allow_redirects" in kwargs:
+            kwargs["follow_redirects"] = kwargs.pop("allow_redirects")
+        data = kwargs.pop("data", None)
+        if data is not None:
+            # httpx 会把 bytearray 当作可迭代对象逐元素发送，需转为 bytes
+            kwargs["content"] = bytes(data) if isinstance(data, bytearray) else data
+        return self.client.request(method, url, **kwargs)
+
+    def _run(self, steps):
+        """
+        执行 _ImageHostBase 中 *_steps 生成器描述的流程，返回其结果
+        """
+        result = None
+        while True:
+            try:
+                op, *args = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            if op == "cpu":
+                fn, *args = args
+                result = fn(*args)
+            else:
+                result = getattr(self, op)(*args)
+
+    def _put_content(self, api_path: str, body: bytes) -> Tuple[int, str]:
+        """
+        PUT contents（缺失的父目录由 GitHub 自动创建）
+
+        404 只可能是仓库 / 分支不存在或 token 权限不足；
+        409 表示 sha 与分支当前内容冲突。均原样返回给调用方处理
+        """
+        with self._write_lock:
+            resp = self._http("PUT", self._api_url(api_path), headers=self._headers, data=body, timeout=30)
+        return resp.status_code, resp.text
+
+    def _conditional_get(self, path: str) -> Tuple[Optional[str], int]:
+        """
+        带 If-None-Match 的 GET contents
+
+        Returns:
+            (sha, status_code)；304 时返回缓存的 sha，目录返回 sha 为 None
+        """
+        headers, cached = self._conditional_headers(path)
+
+        r = self._http("GET", self._api_url(path), headers=headers)
+        if r.status_code == 304:
+            return cached[1], 304
+        if not _ok(r):
+            self._etag_cache.pop(path, None)
+            return None, r.status_code
+
+        return self._remember_etag(path, r.headers.get("ETag"), r.json()), r.status_code
+
+    def _graphql(self, query: str, variables) -> dict:
+        """
+        调用 GitHub GraphQL API
+
+        Args:
+            query: GraphQL 查询 / 变更语句
+            variables: dict，或已序列化的 JSON bytes（用于内嵌大块 base64 内容）
+
+        Returns:
+            响应中的 data 字段
+        """
+        body = self._graphql_body(query, variables)
+
+        r = self._http("POST", "https://api.github.com/graphql", headers=self._headers, data=body)
+        if not _ok(r):
+            raise RuntimeError(r.text)
+
+        return self._graphql_data(r.json())
+
+    def _lookup_sha(self, path: str) -> Tuple[Optional[str], int]:
+        """
+        获取文件 sha：优先使用 tree 缓存，未命中再走条件 GET
+        """
+        sha = self._cached_sha(path)
+        if sha is not None:
+            return sha, 200
+        return self._conditional_get(path)
+
+    def _head_commit(self) -> Tuple[str, str]:
+        """
+        获取分支当前 HEAD commit sha 与根 tree sha（一次 GraphQL 请求）
+        """
+        return self._head_target(self._graphql(self._HEAD_OID_QUERY, self._head_oid_variables()))
+
+    def _list_tree(self):
+        """
+        读取 subdir 这一层目录，填充 {仓库路径: blob sha} 缓存
+
+        只读一层目录，开销与仓库大小无关；目录不存在时缓存为空，各文件按未命中处理
+        """
+        r = self._http("GET", self._dir_tree_url(self.branch, self.subdir), headers=self._headers)
         if r.status_code == 404:
+            self._tree_cache = {}
             return
+        if not _ok(r):
+            raise RuntimeError(r.text)
+        self._cache_tree(r.json(), self.subdir)
 
-        sha = r.json()["sha"]
-        body = {
-            "message": f"delete {filename}",
-            "sha": sha,
-            "branch": self.branch,
-        }
+    def _commit_removal(self, head: str, root_tree: str, removed: List[dict], message: str) -> Tuple[str, str]:
+        """
+        在单个 commit 中删除文件：建 tree → 建 commit → 更新 ref
+
+        Returns:
+            (新 commit sha, 新根 tree sha)
+        """
+        with self._write_lock:
+            r = self._http(
+                "POST",
+                self._git_url("trees"),
+                headers=self._headers,
+                json=self._removal_tree_body(root_tree, removed),
+            )
+            if not _ok(r):
+                raise RuntimeError(r.text)
+            tree_sha = r.json()["sha"]
+
+            r = self._http(
+                "POST",
+                self._git_url("commits"),
+                headers=self._headers,
+                json={"message": message, "tree": tree_sha, "parents": [head]},
+            )
+            if not _ok(r):
+                raise RuntimeError(r.text)
+            commit_sha = r.json()["sha"]
 
-        with self._sema:
-            resp = self.session.delete(
-                self._api_url(api_path),
+            r = self._http(
+                "PATCH",
+                self._git_url(f"refs/heads/{self.branch}"),
                 headers=self._headers,
-                data=json.dumps(body),
+                json={"sha": commit_sha},
             )
+            if not _ok(r):
+                raise RuntimeError(r.text)
+
+        return commit_sha, tree_sha
+
+    def _delete_by_sha(self, path: str, sha: str) -> Tuple[int, str]:
+        """
+        已知 sha 时直接 DELETE（不再预先 GET）
+        """
+        with self._write_lock:
+            resp = self._http(
+                "DELETE",
+                self._api_url(path),
+                headers=self._headers,
+                data=self._delete_body(path, sha),
+            )
+
+        if _ok(resp):
+            self._invalidate(path)
+        return resp.status_code, resp.text
+
+    def _dir_tree(self, ref: str, dir_path: str) -> dict:
+        """
+        读取单个目录的 tree（非递归，只含直接子项，条目 path 为相对目录的名字）
+
+        contents API 列目录不支持分页、最多返回 1000 项，因此改用 Git Data API
+        """
+        r = self._http("GET", self._dir_tree_url(ref, dir_path), headers=self._headers)
+        if not _ok(r):
+            raise RuntimeError(f"无法读取目录: {dir_path}")
+        return r.json()
+
+    # ======================================================
+    # 单文件 CRUD
+    # ======================================================
+    def upload(self, file_path: str) -> str:
+        """
+        上传单个文件到图床
+
+        Args:
+            file_path: 本地文件路径
+
+        Returns:
+            CDN 访问 URL
+        """
+        return self._run(self._upload_steps(file_path))
+
+    def delete(self, filename: str) -> None:
+        """
+        删除仓库中的文件（若不存在则忽略）
 
-        if not resp.ok:
-            raise RuntimeError(resp.text)
+        Args:
+            filename: 仓库中的文件名（不要带目录）
+        """
+        self._run(self._delete_steps(f"{self.subdir}{filename}"))
 
     def update(self, file_path: str, filename: Optional[str] = None) -> str:
         """
@@ -219,65 +907,480 @@ class GitHubImageHost:
         Returns:
             CDN URL
         """
-        self._ensure_dir()
+        return self._run(self._update_steps(file_path, filename))
 
-        p = Path(file_path)
-        name = filename or p.name
-        api_path = f"{self.subdir}{name}"
+    def exists(self, filename: str) -> bool:
+        """
+        判断文件是否存在于仓库
 
-        r = self.session.get(self._api_url(api_path), headers=self._headers)
-        if not r.ok:
-            raise FileNotFoundError(name)
+        优先用 HEAD（只取响应头）；host 不支持 HEAD 时退回条件 GET
+        """
+        path = f"{self.subdir}{filename}"
+        url = self._api_url(path)
+        host = urlsplit(url).netloc
 
-        sha = r.json()["sha"]
-        content_b64 = base64.b64encode(p.read_bytes()).decode("ascii")
+        if _HEAD_SUPPORTED.get(host, True):
+            headers, _ = self._conditional_headers(path)
+            r = self._http("HEAD", url, headers=headers, allow_redirects=True)
+            if r.status_code != 405:
+                return _ok(r)
+            _HEAD_SUPPORTED[host] = False
 
-        body = {
-            "message": f"update {name}",
-            "content": content_b64,
-            "sha": sha,
-            "branch": self.branch,
-        }
+        _, status = self._conditional_get(path)
+        return status < 400
 
-        with self._sema:
-            resp = self.session.put(
-                self._api_url(api_path),
-                headers=self._headers,
-                data=json.dumps(body),
+    # ======================================================
+    # 目录操作
+    # ======================================================
+    def clear_dir(
+        self,
+        *,
+        keep: Optional[Set[str]] = None,
+        dir_path: Optional[str] = None,
+    ) -> int:
+        """
+        清空目录，但保留指定文件
+
+        Args:
+            keep: 需要保留的文件名集合（如 {'.gitkeep'}）
+            dir_path: 指定目录（默认当前 subdir）
+
+        Returns:
+            删除的文件数量
+
+        Raises:
+            RuntimeError: 目录不存在
+        """
+        target_dir = dir_path.strip("/") + "/" if dir_path else self.subdir
+        return self._run(self._clear_dir_steps(target_dir, keep or set()))
+
+    # ======================================================
+    # 批量操作
+    # ======================================================
+    def _run_batch(self, fn, jobs: Dict[str, tuple]) -> Dict[str, Optional[str]]:
+        """
+        线程池中执行 fn(*args)，单个条目失败不影响其余条目
+
+        查询 / 哈希 / 编码在线程间并发，写请求由 _write_lock 串行化
+
+        Args:
+            jobs: {输入: fn 的参数}
+
+        Raises:
+            BatchError: 有条目失败，其中带有已成功与失败的条目
+        """
+        done, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as ex:
+            futures = {ex.submit(fn, *args): key for key, args in jobs.items()}
+            for fut in as_completed(futures):
+                try:
+                    done[futures[fut]] = fut.result()
+                except Exception as e:
+                    errors[futures[fut]] = e
+        if errors:
+            raise BatchError(done, errors)
+        return done
+
+    def upload_many(self, files: Iterable[str]) -> Dict[str, str]:
+        """
+        批量上传文件（每个文件一个 commit，写请求逐个发送）
+
+        大批量上传建议使用 upload_many_atomic
+
+        Returns:
+            {本地路径: CDN URL}
+
+        Raises:
+            BatchError: 部分文件失败，done 中为已上传成功的文件
+        """
+        return self._run_batch(self.upload, {f: (f,) for f in files})
+
+    def upload_many_atomic(self, files: Iterable[str]) -> Dict[str, str]:
+        """
+        批量上传文件，所有文件合并为一个 commit、一次请求
+
+        基于 GraphQL createCommitOnBranch；仓库中已存在的同名文件会被覆盖
+
+        Returns:
+            {本地路径: CDN URL}
+        """
+        files = list(files)
+        paths = [Path(f) for f in files]
+        for p in paths:
+            if not p.is_file():
+                raise FileNotFoundError(str(p))
+        if not paths:
+            return {}
+
+        head, _ = self._head_commit()
+
+        names = [self._upload_name(p)[0] for p in paths]
+        variables = self._atomic_commit_variables(names, paths, head)
+
+        with self._write_lock:
+            self._graphql(self._CREATE_COMMIT_MUTATION, variables)
+
+        self._after_atomic_upload(names)
+        return {f: self._cdn_url(name) for f, name in zip(files, names)}
+
+    def delete_many(self, filenames: Iterable[str]) -> None:
+        """
+        批量删除仓库文件（每个文件一个 commit，写请求逐个发送）
+
+        Raises:
+            BatchError: 部分文件失败，done 中为已删除的文件（值为 None）
+        """
+        filenames = list(filenames)
+        if not filenames:
+            return
+
+        # 先一次性读取目录 tree，后续各文件无需再单独 GET sha
+        self._list_tree()
+        try:
+            self._run_batch(self.delete, {f: (f,) for f in filenames})
+        finally:
+            self._tree_cache = None
+
+    def update_many(self, files: Dict[str, str]) -> Dict[str, str]:
+        """
+        批量更新文件（每个文件一个 commit，写请求逐个发送）
+
+        Args:
+            files: {本地路径: 仓库文件名}
+
+        Raises:
+            BatchError: 部分文件失败，done 中为已更新成功的文件
+        """
+        if not files:
+            return {}
+
+        self._list_tree()
+        try:
+            return self._run_batch(self.update, {src: (src, dst) for src, dst in files.items()})
+        finally:
+            self._tree_cache = None
+
+
+class AsyncGitHubImageHost(_ImageHostBase):
+    """
+    GitHub 图床异步客户端（基于 aiohttp）
+
+    接口与 GitHubImageHost 一致，方法均为协程；
+    单线程 + 一个连接池即可承载成百上千的并发请求，适合超大批量操作
+
+    用法：
+        async with AsyncGitHubImageHost(owner=..., repo=...) as host:
+            urls = await host.upload_many(files)
+    """
+
+    def __init__(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        branch: str = "main",
+        subdir: str = "img/",
+        token: Optional[str] = None,
+        custom_cdn: Optional[str] = None,
+        max_concurrency: int = 4,
+        content_addressed: bool = False,
+        session: Optional["aiohttp.ClientSession"] = None,
+    ):
+        """
+        初始化异步图床实例
+
+        Args:
+            owner: GitHub 用户名 / 组织名
+            repo: 仓库名
+            branch: 分支名（默认 main）
+            subdir: 仓库内目录（如 img/）
+            token: GitHub PAT（不传则读取环境变量 GITHUB_PAT）
+            custom_cdn: 自定义 CDN 前缀（不传则使用 jsDelivr）
+            max_concurrency: 最大并发请求数（写请求始终逐个发送）
+            content_addressed: 按内容哈希命名（<sha256 前 16 位><扩展名>）
+            session: 可复用的 aiohttp.ClientSession（不传则首次请求时创建）
+        """
+        if aiohttp is None:
+            raise RuntimeError("AsyncGitHubImageHost 需要安装 aiohttp：pip install aiohttp")
+
+        super().__init__(
+            owner=owner,
+            repo=repo,
+            branch=branch,
+            subdir=subdir,
+            token=token,
+            custom_cdn=custom_cdn,
+            max_concurrency=max_concurrency,
+            content_addressed=content_addressed,
+        )
+
+        self.session = session
+        self._own_session = session is None
+        # _sema 限制同时在途的请求；_op_sema 限制同时进行的上传 / 更新，
+        # 避免 gather 一开始就把整批文件编码成请求体堆在内存里
+        self._sema = asyncio.Semaphore(max_concurrency)
+        self._op_sema = asyncio.Semaphore(max_concurrency)
+        # 同一分支上的 contents 写操作必须串行，并发写入只会互相撞出 409
+        self._write_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncGitHubImageHost":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """
+        关闭内部创建的 ClientSession（外部传入的不处理）
+        """
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # ======================================================
+    # 内部工具方法（不建议外部直接调用）
+    # ======================================================
+    async def _http(self, method: str, url: str, **kwargs) -> Tuple[int, Mapping[str, str], bytes]:
+        """
+        发送 HTTP 请求，在连接归还连接池前读完响应体
+
+        Returns:
+            (status, headers, body)
+        """
+        if self.session is None:
+            # ClientSession 需在事件循环内创建，因此延迟到首次请求
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._max_concurrency, keepalive_timeout=60),
             )
 
-        if not resp.ok:
-            raise RuntimeError(resp.text)
+        if "data" in kwargs:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
 
-        return self._cdn_url(name)
+        async with self._sema:
+            async with self.session.request(method, url, **kwargs) as r:
+                return r.status, r.headers, await r.read()
 
-    def exists(self, filename: str) -> bool:
+    async def _run(self, steps):
         """
-        判断文件是否存在于仓库
+        执行 _ImageHostBase 中 *_steps 生成器描述的流程，返回其结果
+
+        哈希 / 编码是 CPU + 磁盘工作，放到线程中避免阻塞事件循环
+        """
+        result = None
+        while True:
+            try:
+                op, *args = steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            if op == "cpu":
+                result = await asyncio.to_thread(*args)
+            else:
+                result = await getattr(self, op)(*args)
+
+    async def _put_content(self, api_path: str, body: bytes) -> Tuple[int, str]:
+        """
+        PUT contents（缺失的父目录由 GitHub 自动创建）
+
+        404 只可能是仓库 / 分支不存在或 token 权限不足；
+        409 表示 sha 与分支当前内容冲突。均原样返回给调用方处理
         """
-        r = self.session.get(
-            self._api_url(f"{self.subdir}{filename}"),
+        async with self._write_lock:
+            status, _, text = await self._http("PUT", self._api_url(api_path), headers=self._headers, data=body)
+        return status, text.decode("utf-8", "replace")
+
+    async def _conditional_get(self, path: str) -> Tuple[Optional[str], int]:
+        """
+        带 If-None-Match 的 GET contents
+
+        Returns:
+            (sha, status_code)；304 时返回缓存的 sha，目录返回 sha 为 None
+        """
+        headers, cached = self._conditional_headers(path)
+
+        status, resp_headers, body = await self._http("GET", self._api_url(path), headers=headers)
+        if status == 304:
+            return cached[1], 304
+        if status >= 400:
+            self._etag_cache.pop(path, None)
+            return None, status
+
+        return self._remember_etag(path, resp_headers.get("ETag"), json.loads(body)), status
+
+    async def _graphql(self, query: str, variables) -> dict:
+        """
+        调用 GitHub GraphQL API，返回响应中的 data 字段
+        """
+        status, _, body = await self._http(
+            "POST",
+            "https://api.github.com/graphql",
             headers=self._headers,
+            data=self._graphql_body(query, variables),
         )
-        return r.ok
+        if status >= 400:
+            raise RuntimeError(body.decode("utf-8", "replace"))
 
-    def get_url(self, filename: str) -> str:
+        return self._graphql_data(json.loads(body))
+
+    async def _lookup_sha(self, path: str) -> Tuple[Optional[str], int]:
         """
-        获取文件的 CDN URL（不检查是否存在）
+        获取文件 sha：优先使用 tree 缓存，未命中再走条件 GET
         """
-        return self._cdn_url(filename)
+        sha = self._cached_sha(path)
+        if sha is not None:
+            return sha, 200
+        return await self._conditional_get(path)
+
+    async def _head_commit(self) -> Tuple[str, str]:
+        """
+        获取分支当前 HEAD commit sha 与根 tree sha（一次 GraphQL 请求）
+        """
+        return self._head_target(await self._graphql(self._HEAD_OID_QUERY, self._head_oid_variables()))
+
+    async def _list_tree(self):
+        """
+        读取 subdir 这一层目录，填充 {仓库路径: blob sha} 缓存（目录不存在时缓存为空）
+        """
+        status, _, body = await self._http("GET", self._dir_tree_url(self.branch, self.subdir), headers=self._headers)
+        if status == 404:
+            self._tree_cache = {}
+            return
+        if status >= 400:
+            raise RuntimeError(body.decode("utf-8", "replace"))
+        self._cache_tree(json.loads(body), self.subdir)
+
+    async def _commit_removal(self, head: str, root_tree: str, removed: List[dict], message: str) -> Tuple[str, str]:
+        """
+        在单个 commit 中删除文件：建 tree → 建 commit → 更新 ref
+
+        Returns:
+            (新 commit sha, 新根 tree sha)
+        """
+        async with self._write_lock:
+            status, _, body = await self._http(
+                "POST",
+                self._git_url("trees"),
+                headers=self._headers,
+                json=self._removal_tree_body(root_tree, removed),
+            )
+            if status >= 400:
+                raise RuntimeError(body.decode("utf-8", "replace"))
+            tree_sha = json.loads(body)["sha"]
+
+            status, _, body = await self._http(
+                "POST",
+                self._git_url("commits"),
+                headers=self._headers,
+                json={"message": message, "tree": tree_sha, "parents": [head]},
+            )
+            if status >= 400:
+                raise RuntimeError(body.decode("utf-8", "replace"))
+            commit_sha = json.loads(body)["sha"]
+
+            status, _, body = await self._http(
+                "PATCH",
+                self._git_url(f"refs/heads/{self.branch}"),
+                headers=self._headers,
+                json={"sha": commit_sha},
+            )
+            if status >= 400:
+                raise RuntimeError(body.decode("utf-8", "replace"))
+
+        return commit_sha, tree_sha
+
+    async def _delete_by_sha(self, path: str, sha: str) -> Tuple[int, str]:
+        """
+        已知 sha 时直接 DELETE（不再预先 GET）
+        """
+        async with self._write_lock:
+            status, _, body = await self._http(
+                "DELETE",
+                self._api_url(path),
+                headers=self._headers,
+                data=self._delete_body(path, sha),
+            )
+        if status < 400:
+            self._invalidate(path)
+        return status, body.decode("utf-8", "replace")
+
+    async def _dir_tree(self, ref: str, dir_path: str) -> dict:
+        """
+        读取单个目录的 tree（非递归，只含直接子项，条目 path 为相对目录的名字）
+        """
+        status, _, body = await self._http("GET", self._dir_tree_url(ref, dir_path), headers=self._headers)
+        if status >= 400:
+            raise RuntimeError(f"无法读取目录: {dir_path}")
+        return json.loads(body)
+
+    # ======================================================
+    # 单文件 CRUD
+    # ======================================================
+    async def upload(self, file_path: str) -> str:
+        """
+        上传单个文件到图床
+
+        Args:
+            file_path: 本地文件路径
+
+        Returns:
+            CDN 访问 URL
+        """
+        async with self._op_sema:
+            return await self._run(self._upload_steps(file_path))
+
+    async def delete(self, filename: str) -> None:
+        """
+        删除仓库中的文件（若不存在则忽略）
+
+        Args:
+            filename: 仓库中的文件名（不要带目录）
+        """
+        await self._run(self._delete_steps(f"{self.subdir}{filename}"))
+
+    async def update(self, file_path: str, filename: Optional[str] = None) -> str:
+        """
+        更新仓库中的文件（覆盖）
+
+        Args:
+            file_path: 本地新文件路径
+            filename: 仓库中的文件名（默认使用本地文件名）
+
+        Returns:
+            CDN URL
+        """
+        async with self._op_sema:
+            return await self._run(self._update_steps(file_path, filename))
+
+    async def exists(self, filename: str) -> bool:
+        """
+        判断文件是否存在于仓库
+
+        优先用 HEAD（只取响应头）；host 不支持 HEAD 时退回条件 GET
+        """
+        path = f"{self.subdir}{filename}"
+        url = self._api_url(path)
+        host = urlsplit(url).netloc
+
+        if _HEAD_SUPPORTED.get(host, True):
+            headers, _ = self._conditional_headers(path)
+            status, _, _ = await self._http("HEAD", url, headers=headers, allow_redirects=True)
+            if status != 405:
+                return status < 400
+            _HEAD_SUPPORTED[host] = False
+
+        _, status = await self._conditional_get(path)
+        return status < 400
 
     # ======================================================
     # 目录操作
     # ======================================================
-    def clear_dir(
+    async def clear_dir(
         self,
         *,
         keep: Optional[Set[str]] = None,
         dir_path: Optional[str] = None,
     ) -> int:
         """
-        清空目录，但保留指定文件
+        清空目录，但保留指定文件（单个 commit 完成）
 
         Args:
             keep: 需要保留的文件名集合（如 {'.gitkeep'}）
@@ -285,68 +1388,112 @@ class GitHubImageHost:
 
         Returns:
             删除的文件数量
+
+        Raises:
+            RuntimeError: 目录不存在
         """
         target_dir = dir_path.strip("/") + "/" if dir_path else self.subdir
-        keep = keep or set()
+        return await self._run(self._clear_dir_steps(target_dir, keep or set()))
 
-        r = self.session.get(self._api_url(target_dir), headers=self._headers)
-        if not r.ok:
-            raise RuntimeError(f"无法读取目录: {target_dir}")
-
-        deleted = 0
-        for item in r.json():
-            if item["type"] != "file":
-                continue
-            if item["name"] in keep:
-                continue
+    # ======================================================
+    # 批量操作
+    # ======================================================
+    @staticmethod
+    async def _run_batch(jobs: Dict[str, Awaitable]) -> Dict[str, Optional[str]]:
+        """
+        并发执行各条目，单个条目失败不影响其余条目
 
-            body = {
-                "message": f"delete {item['name']}",
-                "sha": item["sha"],
-                "branch": self.branch,
-            }
+        Args:
+            jobs: {输入: 协程}
 
-            with self._sema:
-                resp = self.session.delete(
-                    self._api_url(item["path"]),
-                    headers=self._headers,
-                    data=json.dumps(body),
-                )
+        Raises:
+            BatchError: 有条目失败，其中带有已成功与失败的条目
+        """
+        keys = list(jobs)
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        done, errors = {}, {}
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                errors[key] = result
+            else:
+                done[key] = result
+        if errors:
+            raise BatchError(done, errors)
+        return done
+
+    async def upload_many(self, files: Iterable[str]) -> Dict[str, str]:
+        """
+        批量上传文件（每个文件一个 commit，写请求逐个发送）
 
-            if not resp.ok:
-                raise RuntimeError(resp.text)
+        大批量上传建议使用 upload_many_atomic
 
-            deleted += 1
+        Returns:
+            {本地路径: CDN URL}
 
-        return deleted
+        Raises:
+            BatchError: 部分文件失败，done 中为已上传成功的文件
+        """
+        return await self._run_batch({f: self.upload(f) for f in files})
 
-    # ======================================================
-    # 批量操作
-    # ======================================================
-    def upload_many(self, files: Iterable[str]) -> Dict[str, str]:
+    async def upload_many_atomic(self, files: Iterable[str]) -> Dict[str, str]:
         """
-        批量上传文件
+        批量上传文件，所有文件合并为一个 commit、一次请求
 
         Returns:
             {本地路径: CDN URL}
         """
-        return {f: self.upload(f) for f in files}
+        files = list(files)
+        paths = [Path(f) for f in files]
+        for p in paths:
+            if not p.is_file():
+                raise FileNotFoundError(str(p))
+        if not paths:
+            return {}
 
-    def delete_many(self, filenames: Iterable[str]) -> None:
+        head, _ = await self._head_commit()
+
+        names = [(await asyncio.to_thread(self._upload_name, p))[0] for p in paths]
+        variables = await asyncio.to_thread(self._atomic_commit_variables, names, paths, head)
+        async with self._write_lock:
+            await self._graphql(self._CREATE_COMMIT_MUTATION, variables)
+
+        self._after_atomic_upload(names)
+        return {f: self._cdn_url(name) for f, name in zip(files, names)}
+
+    async def delete_many(self, filenames: Iterable[str]) -> None:
         """
-        批量删除仓库文件
+        批量删除仓库文件（每个文件一个 commit，写请求逐个发送）
+
+        Raises:
+            BatchError: 部分文件失败，done 中为已删除的文件（值为 None）
         """
-        for f in filenames:
-            self.delete(f)
+        filenames = list(filenames)
+        if not filenames:
+            return
 
-    def update_many(self, files: Dict[str, str]) -> Dict[str, str]:
+        await self._list_tree()
+        try:
+            await self._run_batch({f: self.delete(f) for f in filenames})
+        finally:
+            self._tree_cache = None
+
+    async def update_many(self, files: Dict[str, str]) -> Dict[str, str]:
         """
-        批量更新文件
+        批量更新文件（每个文件一个 commit，写请求逐个发送）
 
         Args:
             files: {本地路径: 仓库文件名}
-        """
-        return {src: self.update(src, dst) for src, dst in files.items()}
-
-
 
+        Raises:
+            BatchError: 部分文件失败，done 中为已更新成功的文件
+        """
+        if not files:
+            return {}
+
+        await self._list_tree()
+        try:
+            return await self._run_batch({src: self.update(src, dst) for src, dst in files.items()})
+        finally:
+            self._tree_cache = None